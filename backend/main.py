@@ -46,6 +46,10 @@ async def health_check():
             "backend": "running",
             "github": "connected" if run_service._runs else "idle",
             "portia": "enabled" if portia_service.portia_enabled else "disabled"
+        },
+        "runs": {
+            "active": run_service.active_run_count,
+            "retained": len(run_service._runs)
         }
     }
 
@@ -62,20 +66,12 @@ async def create_run(payload: dict):
 @app.get("/runs")
 async def list_runs():
     """List all runs"""
-    runs = []
-    for run_id, run in run_service._runs.items():
-        runs.append({
-            "runId": run_id,
-            "issueUrl": run["issueUrl"],
-            "repo": run["repo"],
-            "status": run["status"]
-        })
-    return runs
+    return await run_service.list_runs()
 
 @app.get("/runs/{run_id}")
 async def get_run(run_id: str):
     """Get run details"""
-    run = run_service._runs.get(run_id)
+    run = run_service.public_record(run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     return run
@@ -87,18 +83,32 @@ async def get_run_events(run_id: str):
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
-    q = run_service._event_queues.get(run_id)
-    if not q:
-        raise HTTPException(status_code=404, detail="Run events not found")
+    # Each client gets its own queue so concurrent viewers see every event
+    q = run_service.subscribe(run_id)
     
     async def event_generator():
-        while True:
-            try:
-                event = await asyncio.wait_for(q.get(), timeout=30.0)
-                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
-            except asyncio.TimeoutError:
-                # Send keepalive
-                yield f"event: keepalive\ndata: {json.dumps({'timestamp': datetime.now().isoformat()})}\n\n"
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(q.get(), timeout=30.0)
+                    # Drain any backlog into a single chunk instead of
+                    # waking up and writing once per event
+                    chunks = []
+                    while event is not None:
+                        chunks.append(f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n")
+                        if q.empty():
+                            break
+                        event = q.get_nowait()
+                    if chunks:
+                        yield "".join(chunks)
+                    if event is None:
+                        # End-of-stream sentinel: the run has finished
+                        break
+                except asyncio.TimeoutError:
+                    # Send keepalive
+                    yield f"event: keepalive\ndata: {json.dumps({'timestamp': datetime.now().isoformat()})}\n\n"
+        finally:
+            run_service.unsubscribe(run_id, q)
     
     return StreamingResponse(
         event_generator(),
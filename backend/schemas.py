@@ -0,0 +1,67 @@
+"""
+Repository Analysis Schemas
+Typed msgspec structs for the analysis ``repo_analyzer`` hands to
+``AIFixGenerator``, and the MessagePack codec used whenever an analysis is
+stored between pipeline stages.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+
+class RepoStructure(msgspec.Struct):
+    """Root-level layout of a repository"""
+    root_files: List[Dict[str, Any]]
+    directories: List[Dict[str, Any]]
+    file_count: int
+    directory_count: int
+    max_depth: int
+
+
+class RepoSummary(msgspec.Struct):
+    """High-level conclusions drawn from the analysis"""
+    project_type: str
+    tech_stack: List[str]
+    structure_insights: List[str]
+    recommendations: List[str]
+
+
+class RepoAnalysis(msgspec.Struct, omit_defaults=True):
+    """A complete repository analysis
+
+    The nested detail sections stay free-form; only the parts the summary
+    and prompts rely on are typed.
+    """
+    repo_name: str
+    structure: RepoStructure
+    files: Dict[str, Any]
+    languages: Dict[str, Any]
+    topics: List[str]
+    readme: Optional[Dict[str, Any]]
+    config_files: Dict[str, Any]
+    patterns: Dict[str, Any]
+    dependencies: Dict[str, Any]
+    summary: RepoSummary
+    repo_info: Optional[Dict[str, Any]] = None
+
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(RepoAnalysis)
+
+
+def encode_analysis(analysis: Dict[str, Any]) -> Optional[bytes]:
+    """MessagePack-encode an analysis, or None if it is incomplete
+
+    Partial analyses (a section that failed and came back as ``{'error': ...}``
+    or ``{}``) do not match the schema and are not worth storing.
+    """
+    try:
+        return _encoder.encode(msgspec.convert(analysis, RepoAnalysis))
+    except msgspec.ValidationError:
+        return None
+
+
+def decode_analysis(data: bytes) -> Dict[str, Any]:
+    """Decode an encoded analysis back into the plain dict callers expect"""
+    return msgspec.to_builtins(_decoder.decode(data))
@@ -0,0 +1,82 @@
+"""
+Analysis Cache
+In-memory LRU cache with per-entry expiry for repository analysis results, so
+repeated analyses of an unchanged repository skip the GitHub round-trips.
+"""
+
+import copy
+import fnmatch
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils import fastjson as json
+
+CacheKey = Tuple[str, str, str]
+
+
+class AnalysisCache:
+    """LRU + TTL cache keyed on ``(tool, target, params)``
+
+    ``target`` is what was analysed (a repository name) and ``params`` pins
+    the version of it, e.g. the HEAD commit SHA, so a push naturally misses.
+    Values are deep-copied on the way in and out; callers are free to
+    mutate what they get back.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        # Analyses run on worker threads as well as the event loop
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(tool: str, params: Dict[str, Any], target: str) -> CacheKey:
+        return (tool, target, json.dumps(params, sort_keys=True))
+
+    def get(self, tool: str, params: Dict[str, Any], target: str) -> Optional[Any]:
+        """Return a copy of the cached value, or None on a miss or expiry"""
+        key = self._key(tool, params, target)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def put(self, tool: str, params: Dict[str, Any], target: str, value: Any) -> None:
+        """Store a copy of ``value``, evicting the least recently used entry"""
+        key = self._key(tool, params, target)
+        entry = (time.monotonic() + self.ttl, copy.deepcopy(value))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_by_pattern(self, pattern: str) -> int:
+        """Drop every entry whose target matches the glob ``pattern``
+
+        Meant for webhook-driven invalidation, e.g. ``"owner/repo"`` on a
+        push or ``"owner/*"`` for a whole organisation. Returns the number
+        of entries removed.
+        """
+        with self._lock:
+            stale = [key for key in self._entries if fnmatch.fnmatchcase(key[1], pattern)]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Global instance
+analysis_cache = AnalysisCache()
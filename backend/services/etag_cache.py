@@ -0,0 +1,69 @@
+"""
+ETag Cache
+On-disk store of GitHub response bodies and their validators. Requests are
+sent with ``If-None-Match``/``If-Modified-Since``; GitHub answers an
+unchanged resource with an empty ``304 Not Modified``, which does not count
+against the rate limit, and the stored body is used instead.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import Any, Dict, Mapping, Optional
+
+from ..utils import fastjson as json
+
+
+class ETagCache:
+    """One JSON file per URL under ``directory``, named by the URL's hash
+
+    Entries are ``{'url', 'etag', 'last_modified', 'body'}``. Writes go
+    through a temporary file and ``os.replace``, so concurrent analyses
+    never see a half-written entry.
+    """
+
+    def __init__(self, directory: str = os.getenv('GITHUB_CACHE_DIR', '.cache/gh')):
+        self.directory = directory
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for ``url``, or None"""
+        try:
+            with open(self._path(url), 'rb') as f:
+                entry = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+        # Guard against hash collisions
+        return entry if entry.get('url') == url else None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validator headers that turn a request for ``entry`` into a conditional one"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def put(self, url: str, response_headers: Mapping[str, str], body: str) -> None:
+        """Store ``body`` if the response carried a validator to revalidate it with"""
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified, 'body': body}
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(entry))
+            os.replace(tmp_path, self._path(url))
+        except OSError as e:
+            print(f"Error writing ETag cache: {e}")
+
+
+# Global instance
+etag_cache = ETagCache()
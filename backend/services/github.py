@@ -6,11 +6,16 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from .ai_fix_generator import ai_fix_generator
 
+# Contents API writes retried on 409 (a concurrent commit on the branch)
+CREATE_FILE_ATTEMPTS = 4
+
 class GitHubService:
     def __init__(self):
         self.token = os.getenv('GITHUB_TOKEN')
         self.api_base = 'https://api.github.com'
         self.demo_mode = not self.token or self.token == 'mock_token_for_testing'
+        # Pooled session so repeated API calls reuse the TLS connection
+        self.session = requests.Session()
         
         if self.demo_mode:
             print("🔧 Running in DEMO MODE - GitHub operations will be simulated")
@@ -38,7 +43,7 @@ class GitHubService:
         
         # Get the latest commit SHA from base branch
         ref_url = f"{self.api_base}/repos/{repo}/git/ref/heads/{base_branch}"
-        response = requests.get(ref_url, headers=self.headers)
+        response = self.session.get(ref_url, headers=self.headers)
         
         if response.status_code != 200:
             return {'error': f'Failed to get base branch: {response.status_code}'}
@@ -52,7 +57,7 @@ class GitHubService:
             'sha': base_sha
         }
         
-        response = requests.post(create_ref_url, headers=self.headers, json=ref_data)
+        response = self.session.post(create_ref_url, headers=self.headers, json=ref_data)
         
         if response.status_code == 201:
             return {
@@ -63,6 +68,27 @@ class GitHubService:
         else:
             return {'error': f'Failed to create branch: {response.status_code}'}
     
+    def delete_branch(self, repo: str, branch: str) -> Dict[str, Any]:
+        """Delete a branch from the repository"""
+        if self.demo_mode:
+            # Simulate branch deletion in demo mode
+            return {
+                'success': True,
+                'branch': branch,
+                'demo_mode': True
+            }
+        
+        url = f"{self.api_base}/repos/{repo}/git/refs/heads/{branch}"
+        response = self.session.delete(url, headers=self.headers)
+        
+        if response.status_code == 204:
+            return {
+                'success': True,
+                'branch': branch
+            }
+        else:
+            return {'error': f'Failed to delete branch: {response.status_code}'}
+    
     def create_file(self, repo: str, branch: str, path: str, content: str, message: str) -> Dict[str, Any]:
         """Create or update a file in the repository"""
         if self.demo_mode:
@@ -76,31 +102,39 @@ class GitHubService:
         
         url = f"{self.api_base}/repos/{repo}/contents/{path}"
         
-        # Check if file exists
-        response = requests.get(url, headers=self.headers, params={'ref': branch})
-        sha = None
-        if response.status_code == 200:
-            sha = response.json()['sha']
-        
-        data = {
-            'message': message,
-            'content': base64.b64encode(content.encode()).decode(),
-            'branch': branch
-        }
-        
-        if sha:
-            data['sha'] = sha
-        
-        response = requests.put(url, headers=self.headers, json=data)
-        
-        if response.status_code in [201, 200]:
-            return {
-                'success': True,
-                'file': path,
-                'sha': response.json()['content']['sha']
+        # A 409 means another commit landed on the branch first; the write
+        # is retried with backoff, re-reading the file SHA each time
+        for attempt in range(CREATE_FILE_ATTEMPTS):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            
+            # Check if file exists
+            response = self.session.get(url, headers=self.headers, params={'ref': branch})
+            sha = None
+            if response.status_code == 200:
+                sha = response.json()['sha']
+            
+            data = {
+                'message': message,
+                'content': base64.b64encode(content.encode()).decode(),
+                'branch': branch
             }
-        else:
-            return {'error': f'Failed to create file: {response.status_code}'}
+            
+            if sha:
+                data['sha'] = sha
+            
+            response = self.session.put(url, headers=self.headers, json=data)
+            
+            if response.status_code in [201, 200]:
+                return {
+                    'success': True,
+                    'file': path,
+                    'sha': response.json()['content']['sha']
+                }
+            if response.status_code != 409:
+                break
+        
+        return {'error': f'Failed to create file: {response.status_code}', 'status_code': response.status_code}
     
     def create_pull_request(self, repo: str, base_branch: str, head_branch: str, title: str, body: str) -> Dict[str, Any]:
         """Create a pull request"""
@@ -128,7 +162,7 @@ class GitHubService:
             'base': base_branch
         }
         
-        response = requests.post(url, headers=self.headers, json=data)
+        response = self.session.post(url, headers=self.headers, json=data)
         
         if response.status_code == 201:
             pr_data = response.json()
@@ -145,7 +179,7 @@ class GitHubService:
                 for error in error_data['errors']:
                     if 'already exists' in error.get('message', ''):
                         # Try to find the existing PR
-                        existing_prs = requests.get(url.replace('/pulls', '/pulls'), headers=self.headers, params={'head': f'{repo.split("/")[0]}:{head_branch}'})
+                        existing_prs = self.session.get(url.replace('/pulls', '/pulls'), headers=self.headers, params={'head': f'{repo.split("/")[0]}:{head_branch}'})
                         if existing_prs.status_code == 200:
                             prs = existing_prs.json()
                             if prs:
@@ -197,7 +231,7 @@ class GitHubService:
                 }
         
         url = f"{self.api_base}/repos/{owner}/{repo}/issues/{issue_number}"
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers)
         
         if response.status_code == 200:
             issue_data = response.json()
@@ -220,7 +254,7 @@ class GitHubService:
             'body': comment
         }
         
-        response = requests.post(url, headers=self.headers, json=data)
+        response = self.session.post(url, headers=self.headers, json=data)
         
         if response.status_code == 201:
             return {
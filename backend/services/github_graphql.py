@@ -0,0 +1,143 @@
+"""
+GitHub GraphQL Snapshot
+Fetches everything the repository analysis needs - metadata, languages,
+topics, the root tree one level deep and selected root files - in a single
+GraphQL v4 request instead of a dozen REST calls.
+"""
+
+import functools
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+# GraphQL tree entry types, in the REST contents API vocabulary
+_ENTRY_TYPES = {'blob': 'file', 'tree': 'dir', 'commit': 'submodule'}
+
+_ENTRY_FIELDS = 'name path type object { ... on Blob { byteSize } }'
+
+
+@functools.lru_cache(maxsize=None)
+def _build_query(files: Sequence[str]) -> str:
+    # Each root file gets an aliased ``object`` lookup; a missing file
+    # simply comes back as null
+    file_fields = '\n'.join(
+        f'    file{i}: object(expression: "HEAD:{name}") {{ ... on Blob {{ text }} }}'
+        for i, name in enumerate(files)
+    )
+    return f'''
+query($owner: String!, $name: String!) {{
+  repository(owner: $owner, name: $name) {{
+    nameWithOwner
+    description
+    url
+    stargazerCount
+    forkCount
+    isPrivate
+    primaryLanguage {{ name }}
+    defaultBranchRef {{
+      name
+      target {{
+        ... on Commit {{
+          tree {{
+            entries {{
+              name path type
+              object {{
+                ... on Blob {{ byteSize }}
+                ... on Tree {{ entries {{ {_ENTRY_FIELDS} }} }}
+              }}
+            }}
+          }}
+        }}
+      }}
+    }}
+    languages(first: 100, orderBy: {{field: SIZE, direction: DESC}}) {{
+      edges {{ size node {{ name }} }}
+    }}
+    repositoryTopics(first: 20) {{ nodes {{ topic {{ name }} }} }}
+{file_fields}
+  }}
+}}
+'''
+
+
+def _entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'name': entry['name'],
+        'path': entry['path'],
+        'type': _ENTRY_TYPES.get(entry['type'], entry['type']),
+        'size': (entry.get('object') or {}).get('byteSize', 0)
+    }
+
+
+def _snapshot(repository: Dict[str, Any], files: Sequence[str]) -> Dict[str, Any]:
+    """Reshape the GraphQL repository into the REST-shaped snapshot"""
+    branch = repository.get('defaultBranchRef') or {}
+    tree = ((branch.get('target') or {}).get('tree') or {}).get('entries')
+
+    contents: Optional[List[Dict[str, Any]]] = None
+    subdirectories: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+    if tree is not None:
+        contents = [_entry(entry) for entry in tree]
+        for entry in tree:
+            if entry['type'] == 'tree':
+                sub_entries = (entry.get('object') or {}).get('entries')
+                subdirectories[entry['path']] = (
+                    [_entry(sub) for sub in sub_entries] if sub_entries is not None else None
+                )
+
+    texts = {}
+    for i, name in enumerate(files):
+        blob = repository.get(f'file{i}')
+        # ``text`` is null for binary blobs
+        if blob and blob.get('text') is not None:
+            texts[name] = blob['text']
+
+    return {
+        'repo_info': {
+            'full_name': repository.get('nameWithOwner'),
+            'description': repository.get('description'),
+            'html_url': repository.get('url'),
+            'stargazers_count': repository.get('stargazerCount'),
+            'forks_count': repository.get('forkCount'),
+            'private': repository.get('isPrivate'),
+            'language': (repository.get('primaryLanguage') or {}).get('name'),
+            'default_branch': branch.get('name')
+        },
+        'contents': contents,
+        'subdirectories': subdirectories,
+        'languages': {
+            edge['node']['name']: edge['size']
+            for edge in (repository.get('languages') or {}).get('edges', [])
+        },
+        'topics': [
+            node['topic']['name']
+            for node in (repository.get('repositoryTopics') or {}).get('nodes', [])
+        ],
+        'files': texts
+    }
+
+
+async def fetch_snapshot(client: httpx.AsyncClient, repo_name: str, files: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Fetch a repository snapshot in one request, or None if GraphQL is unavailable
+
+    GraphQL always needs an authenticated client; callers fall back to REST
+    on None.
+    """
+    try:
+        owner, name = repo_name.split('/', 1)
+        response = await client.post(GRAPHQL_URL, json={
+            'query': _build_query(tuple(files)),
+            'variables': {'owner': owner, 'name': name}
+        })
+        if response.status_code != 200:
+            return None
+
+        repository = (response.json().get('data') or {}).get('repository')
+        if not repository:
+            return None
+        return _snapshot(repository, files)
+    except Exception as e:
+        print(f"Error fetching GraphQL snapshot: {e}")
+        return None
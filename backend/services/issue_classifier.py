@@ -0,0 +1,96 @@
+"""
+Issue Classifier
+Keyword rules for the issue shapes that come up again and again (add a
+LICENSE, add CONTRIBUTING.md, extend the README, ...). When exactly one rule
+matches an issue, its frozen analysis stands in for the AI analysis call;
+anything else is left to the model.
+"""
+
+import collections
+import re
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+
+def _analysis(issue_type: str, priority: str, complexity: str, files: Tuple[str, ...],
+              actions: Tuple[str, ...], approach: str) -> Mapping[str, Any]:
+    return MappingProxyType({
+        'issue_type': issue_type,
+        'priority': priority,
+        'required_actions': actions,
+        'files_to_create': files,
+        'files_to_modify': (),
+        'technical_requirements': (),
+        'solution_approach': approach,
+        'estimated_complexity': complexity,
+        'testing_requirements': ()
+    })
+
+
+# Leading verb shared by the rules, with an optional article
+_ADD = r'(add|create)\s+(an?\s+|the\s+)?'
+
+# (title pattern, context pattern, analysis) triples. A title pattern must
+# match the whole title, so "Fix license check in CI" or "Create users table
+# migration" never qualify. A context pattern, where given, must also occur
+# somewhere in the title or body
+_RULES = (
+    (re.compile(_ADD + r'([\w.-]+\s+){0,2}licen[cs]e(\s+file)?|missing\s+licen[cs]e(\s+file)?', re.I), None, _analysis(
+        'license', 'medium', 'low', ('LICENSE',),
+        ('Add a LICENSE file with the full license text',),
+        'Add a standard open source license with a copyright notice'
+    )),
+    (re.compile(_ADD + r'(contributing(\.md)?|contribution\s+guidelines?|contributor\s+guide)(\s+file)?', re.I), None, _analysis(
+        'documentation', 'low', 'low', ('CONTRIBUTING.md',),
+        ('Write contribution guidelines covering setup, workflow and pull requests',),
+        'Add a CONTRIBUTING.md describing how to propose and submit changes'
+    )),
+    (re.compile(_ADD + r'(code\s+of\s+conduct|code_of_conduct\.md)(\s+file)?', re.I), None, _analysis(
+        'documentation', 'low', 'low', ('CODE_OF_CONDUCT.md',),
+        ('Adopt a code of conduct for the project community',),
+        'Add a CODE_OF_CONDUCT.md based on the Contributor Covenant'
+    )),
+    (re.compile(_ADD + r'(security\s+policy|security\.md)(\s+file)?', re.I), None, _analysis(
+        'documentation', 'medium', 'low', ('SECURITY.md',),
+        ('Document supported versions and how to report vulnerabilities',),
+        'Add a SECURITY.md with the vulnerability reporting process'
+    )),
+    (re.compile(_ADD + r'\.?gitignore(\s+file)?', re.I), None, _analysis(
+        'config', 'low', 'low', ('.gitignore',),
+        ('Ignore build output, dependencies and local environment files',),
+        'Add a .gitignore suited to the project tech stack'
+    )),
+    (re.compile(r'(add|create|update|improve)\s+(an?\s+|the\s+)?([\w-]+\s+){0,3}(table|section|overview)'
+                r'(\s+(to|in)\s+(the\s+)?readme(\.md)?)?', re.I),
+     re.compile(r'\breadme\b', re.I), _analysis(
+        'documentation', 'low', 'low', ('README.md',),
+        ('Extend the README with the requested content',),
+        'Update README.md with the content the issue asks for'
+    )),
+)
+
+# Hit/miss counts, for spotting issue shapes worth a new rule
+stats = collections.Counter()
+
+
+def classify(issue_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return a local analysis for the issue, or None if the model should decide
+
+    Only an unambiguous match counts: a title that matches no rule, or
+    several, goes to the model.
+    """
+    title = issue_data.get('title', '').strip().rstrip('.')
+    text = f"{title}\n{issue_data.get('body') or ''}"
+    matches = [
+        analysis for pattern, context, analysis in _RULES
+        if pattern.fullmatch(title) and (context is None or context.search(text))
+    ]
+    if len(matches) != 1:
+        stats['miss'] += 1
+        return None
+
+    stats['hit'] += 1
+    return {
+        key: list(value) if isinstance(value, tuple) else value
+        for key, value in matches[0].items()
+    }
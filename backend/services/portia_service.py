@@ -222,37 +222,37 @@ Please provide a comprehensive, actionable plan that leverages Portia's advanced
         try:
             context_parts = []
             
-            # Project type and tech stack
-            summary = repo_analysis.get('summary', {})
-            project_type = summary.get('project_type', 'Unknown')
-            tech_stack = summary.get('tech_stack', [])
+            # Only the compact form of the analysis goes into prompts
+            context = repo_analyzer.compact_context(repo_analysis)
             
-            context_parts.append(f"Project Type: {project_type}")
-            if tech_stack:
-                context_parts.append(f"Tech Stack: {', '.join(tech_stack)}")
+            # Project type and tech stack
+            context_parts.append(f"Project Type: {context['project_type']}")
+            if context['tech_stack']:
+                context_parts.append(f"Tech Stack: {', '.join(context['tech_stack'])}")
             
             # Repository structure
-            structure = repo_analysis.get('structure', {})
-            if structure.get('directories'):
-                dirs = [d['name'] for d in structure['directories']]
-                context_parts.append(f"Main Directories: {', '.join(dirs)}")
+            if context['top_directories']:
+                dirs = ', '.join(context['top_directories'])
+                hidden = context['directory_count'] - len(context['top_directories'])
+                if hidden:
+                    dirs += f" (+{hidden} more)"
+                context_parts.append(f"Main Directories: {dirs}")
             
             # Languages
-            languages = repo_analysis.get('languages', {}).get('languages', {})
-            if languages:
-                primary_lang = repo_analysis.get('languages', {}).get('primary_language', 'Unknown')
-                context_parts.append(f"Primary Language: {primary_lang}")
-                context_parts.append(f"Languages: {', '.join(languages.keys())}")
+            if context['top_languages']:
+                context_parts.append(f"Primary Language: {context['primary_language'] or 'Unknown'}")
+                context_parts.append(f"Languages: {', '.join(f'{name} {pct}%' for name, pct in context['top_languages'])}")
             
             # Configuration files
-            config_files = repo_analysis.get('config_files', {})
-            if config_files.get('package_managers'):
-                context_parts.append(f"Package Manager Files: {', '.join([f['name'] for f in config_files['package_managers']])}")
+            if context['package_manager_files']:
+                context_parts.append(f"Package Manager Files: {', '.join(context['package_manager_files'])}")
             
             # README analysis
-            readme = repo_analysis.get('readme')
+            readme = context['readme']
             if readme:
                 context_parts.append(f"Has README: Yes ({readme['file']})")
+                if readme.get('truncated'):
+                    context_parts.append(f"README was truncated (only the first part of {readme['size']} bytes was read)")
                 if readme.get('has_installation'):
                     context_parts.append("Has installation instructions")
                 if readme.get('has_usage'):
@@ -263,7 +263,7 @@ Please provide a comprehensive, actionable plan that leverages Portia's advanced
                 context_parts.append("Has README: No")
             
             # Topics
-            topics = repo_analysis.get('topics', [])
+            topics = context['topics']
             if topics:
                 context_parts.append(f"Repository Topics: {', '.join(topics)}")
             
@@ -4,11 +4,53 @@ Analyzes GitHub repositories to understand project structure, existing files, an
 before generating AI-powered fixes.
 """
 
+import asyncio
+import atexit
+import importlib.util
 import os
-import requests
-import json
+import re
+import httpx
+import numpy as np
 from typing import Dict, Any, List, Optional
 from urllib.parse import urlparse
+from ..schemas import decode_analysis, encode_analysis
+from ..utils import fastjson as json
+from . import github_graphql
+from .analysis_cache import analysis_cache
+from .etag_cache import etag_cache
+
+# HTTP/2 lets the concurrent sub-requests share one connection, but httpx
+# only speaks it when the optional h2 package is installed
+_HTTP2 = importlib.util.find_spec('h2') is not None
+
+README_FILES = ['README.md', 'README.rst', 'README.txt', 'readme.md']
+# Root files whose contents the analysis reads
+SNAPSHOT_FILES = README_FILES + ['package.json', 'requirements.txt']
+# Prompts only need the start of a README, so longer ones are cut off here
+README_MAX_BYTES = 16384
+
+# Common configuration files
+CONFIG_PATTERNS = {
+    'package_managers': ['package.json', 'requirements.txt', 'Pipfile', 'pyproject.toml', 'Cargo.toml', 'go.mod'],
+    'build_tools': ['Makefile', 'CMakeLists.txt', 'build.gradle', 'pom.xml', 'webpack.config.js'],
+    'linters': ['.eslintrc', '.pylintrc', '.flake8', 'tsconfig.json'],
+    'testing': ['jest.config.js', 'pytest.ini', '.coveragerc', 'tox.ini'],
+    'deployment': ['Dockerfile', 'docker-compose.yml', '.github/workflows', 'deploy.yml'],
+    'other': ['.gitignore', '.env.example', 'LICENSE', 'CHANGELOG.md']
+}
+
+# One compiled pattern classifies a file name. Each category is a lookahead
+# branch tried in order, so a name that contains patterns from several
+# categories lands in the first, and ``lastgroup`` names the category
+_CONFIG_RE = re.compile('|'.join(
+    f"(?=.*?(?:{'|'.join(map(re.escape, patterns))}))(?P<{category}>)"
+    for category, patterns in CONFIG_PATTERNS.items()
+), re.DOTALL)
+
+# How much of each list compact_context keeps for prompts
+CONTEXT_MAX_LANGUAGES = 5
+CONTEXT_MAX_DIRECTORIES = 10
+CONTEXT_MAX_TOPICS = 10
 
 class RepoAnalyzer:
     """Analyzes GitHub repositories for better AI fix generation"""
@@ -19,50 +61,57 @@ class RepoAnalyzer:
             'Authorization': f'token {self.github_token}',
             'Accept': 'application/vnd.github.v3+json'
         }
+        # Synchronous lookups reuse one pooled connection across analyses;
+        # the async fan-out opens its own client inside each event loop
+        self.client = httpx.Client(
+            http2=_HTTP2,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+        atexit.register(self.client.close)
     
     def analyze_repository(self, repo_name: str) -> Dict[str, Any]:
-        """Comprehensive repository analysis"""
+        """Comprehensive repository analysis, cached per HEAD commit"""
+        head_sha = self._get_head_sha(repo_name)
+        if head_sha:
+            cached = analysis_cache.get('analyze_repository', {'sha': head_sha}, repo_name)
+            if cached is not None:
+                print(f"♻️ Using cached analysis for {repo_name} @ {head_sha[:7]}")
+                return decode_analysis(cached)
+        
+        analysis = self._analyze_repository(repo_name)
+        if head_sha and 'error' not in analysis:
+            # Stored MessagePack-encoded; incomplete analyses encode to None
+            encoded = encode_analysis(analysis)
+            if encoded is not None:
+                analysis_cache.put('analyze_repository', {'sha': head_sha}, repo_name, encoded)
+        return analysis
+    
+    def _get_head_sha(self, repo_name: str) -> Optional[str]:
+        """Get the SHA of the default branch head, used as the cache version"""
+        try:
+            url = f"https://api.github.com/repos/{repo_name}/commits/HEAD"
+            # The sha media type returns just the 40-char SHA as the body
+            headers = {**self.headers, 'Accept': 'application/vnd.github.sha'}
+            entry = etag_cache.get(url)
+            response = self.client.get(url, headers={**headers, **etag_cache.conditional_headers(entry)})
+            if response.status_code == 304 and entry:
+                return entry['body'].strip()
+            if response.status_code == 200:
+                etag_cache.put(url, response.headers, response.text)
+                return response.text.strip()
+            return None
+        except Exception as e:
+            print(f"Error getting head commit: {e}")
+            return None
+    
+    def _analyze_repository(self, repo_name: str) -> Dict[str, Any]:
+        """Run the full analysis against the GitHub API"""
         try:
             print(f"🔍 Analyzing repository: {repo_name}")
             
-            analysis = {
-                'repo_name': repo_name,
-                'structure': {},
-                'files': {},
-                'languages': {},
-                'topics': [],
-                'readme': None,
-                'config_files': {},
-                'patterns': {},
-                'dependencies': {},
-                'summary': {}
-            }
-            
-            # Get repository info
-            repo_info = self._get_repo_info(repo_name)
-            if repo_info:
-                analysis['repo_info'] = repo_info
-            
-            # Analyze repository structure
-            analysis['structure'] = self._analyze_structure(repo_name)
-            
-            # Get repository languages
-            analysis['languages'] = self._get_languages(repo_name)
-            
-            # Get repository topics
-            analysis['topics'] = self._get_topics(repo_name)
-            
-            # Analyze README and documentation
-            analysis['readme'] = self._analyze_readme(repo_name)
-            
-            # Find configuration files
-            analysis['config_files'] = self._find_config_files(repo_name)
-            
-            # Analyze code patterns
-            analysis['patterns'] = self._analyze_patterns(repo_name)
-            
-            # Find dependencies
-            analysis['dependencies'] = self._find_dependencies(repo_name)
+            # Callers run on worker threads, so each analysis gets its own loop
+            analysis = asyncio.run(self._fetch_all(repo_name))
             
             # Generate summary
             analysis['summary'] = self._generate_summary(analysis)
@@ -86,19 +135,135 @@ class RepoAnalyzer:
                 'summary': {}
             }
     
-    def _get_repo_info(self, repo_name: str) -> Optional[Dict[str, Any]]:
-        """Get basic repository information"""
+    async def _fetch_all(self, repo_name: str) -> Dict[str, Any]:
+        """Fetch a repository snapshot and assemble the analysis from it"""
+        async with httpx.AsyncClient(
+            http2=_HTTP2,
+            headers=self.headers,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=16)
+        ) as client:
+            # One GraphQL request covers the whole analysis; it needs a
+            # token, and REST remains the fallback
+            snapshot = None
+            if self.github_token:
+                snapshot = await github_graphql.fetch_snapshot(client, repo_name, SNAPSHOT_FILES)
+            if snapshot is None:
+                snapshot = await self._fetch_rest_snapshot(client, repo_name)
+        
+        return self._assemble(repo_name, snapshot)
+    
+    async def _fetch_rest_snapshot(self, client: httpx.AsyncClient, repo_name: str) -> Dict[str, Any]:
+        """Fetch the snapshot over REST, fanning independent requests out concurrently"""
+        base_url = f"https://api.github.com/repos/{repo_name}"
+        
+        # Repository info, root listing, languages and topics are independent
+        repo_info, contents, languages, topics = await asyncio.gather(
+            self._get_json(client, base_url, "repo info"),
+            self._get_json(client, f"{base_url}/contents", "repository contents"),
+            self._get_json(client, f"{base_url}/languages", "languages"),
+            self._get_json(client, f"{base_url}/topics", "topics")
+        )
+        
+        # The root listing says which directories and files exist, so they
+        # are fetched directly instead of probed one by one
+        directories = [item for item in contents or [] if item['type'] == 'dir']
+        root_files = [
+            item for item in contents or []
+            if item['type'] == 'file' and item['name'] in SNAPSHOT_FILES
+        ]
+        listings, texts = await asyncio.gather(
+            asyncio.gather(*(
+                self._get_json(client, f"{base_url}/contents/{directory['path']}", "subdirectory")
+                for directory in directories
+            )),
+            asyncio.gather(*(
+                self._get_text(
+                    client, item['download_url'], item['name'],
+                    max_bytes=README_MAX_BYTES if item['name'] in README_FILES else None
+                )
+                for item in root_files
+            ))
+        )
+        
+        return {
+            'repo_info': repo_info,
+            'contents': contents,
+            'subdirectories': {
+                directory['path']: listing for directory, listing in zip(directories, listings)
+            },
+            'languages': languages,
+            'topics': (topics or {}).get('names', []),
+            'files': {
+                item['name']: text for item, text in zip(root_files, texts) if text is not None
+            }
+        }
+    
+    async def _get_json(self, client: httpx.AsyncClient, url: str, what: str) -> Optional[Any]:
+        """GET a GitHub API resource, or None if it is unavailable"""
         try:
-            url = f"https://api.github.com/repos/{repo_name}"
-            response = requests.get(url, headers=self.headers)
-            if response.status_code == 200:
-                return response.json()
+            body = await self._get_revalidated(client, url)
+            return json.loads(body) if body is not None else None
+        except Exception as e:
+            print(f"Error getting {what}: {e}")
             return None
+    
+    async def _get_text(self, client: httpx.AsyncClient, url: str, what: str, max_bytes: Optional[int] = None) -> Optional[str]:
+        """Download a raw file, or None if it is unavailable
+        
+        With ``max_bytes`` only that prefix is requested (raw.githubusercontent.com
+        honours Range) and at most that much is read, should the server ignore it.
+        """
+        try:
+            if max_bytes is None:
+                return await self._get_revalidated(client, url)
+            
+            headers = {'Range': f'bytes=0-{max_bytes - 1}'}
+            async with client.stream('GET', url, headers=headers) as response:
+                if response.status_code not in (200, 206):
+                    return None
+                content = b''
+                async for chunk in response.aiter_bytes():
+                    content += chunk
+                    if len(content) >= max_bytes:
+                        break
+            # The cut can land inside a multi-byte character
+            return content[:max_bytes].decode('utf-8', errors='ignore')
         except Exception as e:
-            print(f"Error getting repo info: {e}")
+            print(f"Error downloading {what}: {e}")
             return None
     
-    def _analyze_structure(self, repo_name: str) -> Dict[str, Any]:
+    async def _get_revalidated(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """GET a body, revalidating any copy in the ETag cache instead of refetching it"""
+        entry = etag_cache.get(url)
+        response = await client.get(url, headers=etag_cache.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            return entry['body']
+        if response.status_code == 200:
+            etag_cache.put(url, response.headers, response.text)
+            return response.text
+        return None
+    
+    def _assemble(self, repo_name: str, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the analysis from a snapshot, whichever API it came from"""
+        contents = snapshot['contents']
+        analysis = {
+            'repo_name': repo_name,
+            'structure': self._analyze_structure(contents, snapshot['subdirectories']),
+            'files': {},
+            'languages': self._get_languages(snapshot['languages']),
+            'topics': snapshot['topics'] or [],
+            'readme': self._analyze_readme(contents, snapshot['files']),
+            'config_files': self._find_config_files(contents),
+            'patterns': self._analyze_patterns(contents),
+            'dependencies': self._find_dependencies(snapshot['files']),
+            'summary': {}
+        }
+        if snapshot['repo_info']:
+            analysis['repo_info'] = snapshot['repo_info']
+        return analysis
+    
+    def _analyze_structure(self, contents: Optional[List[Dict[str, Any]]], subdirectories: Dict[str, Optional[List[Dict[str, Any]]]]) -> Dict[str, Any]:
         """Analyze repository file structure"""
         try:
             structure = {
@@ -109,31 +274,24 @@ class RepoAnalyzer:
                 'max_depth': 0
             }
             
-            # Get root contents
-            url = f"https://api.github.com/repos/{repo_name}/contents"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                contents = response.json()
-                
-                for item in contents:
-                    if item['type'] == 'file':
-                        structure['root_files'].append({
-                            'name': item['name'],
-                            'path': item['path'],
-                            'size': item['size']
-                        })
-                        structure['file_count'] += 1
-                    elif item['type'] == 'dir':
-                        structure['directories'].append({
-                            'name': item['name'],
-                            'path': item['path']
-                        })
-                        structure['directory_count'] += 1
-                        
-                        # Analyze subdirectories (limited depth for performance)
-                        sub_structure = self._analyze_subdirectory(repo_name, item['path'], depth=1)
-                        structure['directories'][-1]['sub_structure'] = sub_structure
+            for item in contents or []:
+                if item['type'] == 'file':
+                    structure['root_files'].append({
+                        'name': item['name'],
+                        'path': item['path'],
+                        'size': item['size']
+                    })
+                    structure['file_count'] += 1
+                elif item['type'] == 'dir':
+                    structure['directories'].append({
+                        'name': item['name'],
+                        'path': item['path']
+                    })
+                    structure['directory_count'] += 1
+                    
+                    # Analyze subdirectories (limited depth for performance)
+                    sub_structure = self._analyze_subdirectory(subdirectories.get(item['path']), depth=1)
+                    structure['directories'][-1]['sub_structure'] = sub_structure
             
             return structure
             
@@ -141,7 +299,7 @@ class RepoAnalyzer:
             print(f"Error analyzing structure: {e}")
             return {'error': str(e)}
     
-    def _analyze_subdirectory(self, repo_name: str, path: str, depth: int, max_depth: int = 3) -> Dict[str, Any]:
+    def _analyze_subdirectory(self, contents: Optional[List[Dict[str, Any]]], depth: int, max_depth: int = 3) -> Dict[str, Any]:
         """Analyze subdirectory structure"""
         if depth > max_depth:
             return {'max_depth_reached': True}
@@ -153,48 +311,40 @@ class RepoAnalyzer:
                 'depth': depth
             }
             
-            url = f"https://api.github.com/repos/{repo_name}/contents/{path}"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                contents = response.json()
-                
-                for item in contents:
-                    if item['type'] == 'file':
-                        structure['files'].append({
-                            'name': item['name'],
-                            'path': item['path'],
-                            'size': item['size']
-                        })
-                    elif item['type'] == 'dir':
-                        structure['directories'].append({
-                            'name': item['name'],
-                            'path': item['path']
-                        })
+            for item in contents or []:
+                if item['type'] == 'file':
+                    structure['files'].append({
+                        'name': item['name'],
+                        'path': item['path'],
+                        'size': item['size']
+                    })
+                elif item['type'] == 'dir':
+                    structure['directories'].append({
+                        'name': item['name'],
+                        'path': item['path']
+                    })
             
             return structure
             
         except Exception as e:
             return {'error': str(e)}
     
-    def _get_languages(self, repo_name: str) -> Dict[str, Any]:
+    def _get_languages(self, languages: Optional[Dict[str, int]]) -> Dict[str, Any]:
         """Get repository programming languages"""
         try:
-            url = f"https://api.github.com/repos/{repo_name}/languages"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                languages = response.json()
-                total_bytes = sum(languages.values())
+            if languages is not None:
+                byte_counts = np.fromiter(languages.values(), dtype=np.int64, count=len(languages))
+                total_bytes = int(byte_counts.sum())
                 
-                # Calculate percentages
-                language_percentages = {}
-                for lang, bytes_count in languages.items():
-                    percentage = (bytes_count / total_bytes) * 100
-                    language_percentages[lang] = {
-                        'bytes': bytes_count,
-                        'percentage': round(percentage, 2)
-                    }
+                # Calculate percentages in one vectorised pass
+                if total_bytes:
+                    percentages = np.round(byte_counts / total_bytes * 100, 2)
+                else:
+                    percentages = np.zeros(len(languages))
+                language_percentages = {
+                    lang: {'bytes': bytes_count, 'percentage': percentage}
+                    for lang, bytes_count, percentage in zip(languages, byte_counts.tolist(), percentages.tolist())
+                }
                 
                 return {
                     'languages': language_percentages,
@@ -208,51 +358,31 @@ class RepoAnalyzer:
             print(f"Error getting languages: {e}")
             return {}
     
-    def _get_topics(self, repo_name: str) -> List[str]:
-        """Get repository topics"""
-        try:
-            url = f"https://api.github.com/repos/{repo_name}/topics"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('names', [])
-            
-            return []
-            
-        except Exception as e:
-            print(f"Error getting topics: {e}")
-            return []
-    
-    def _analyze_readme(self, repo_name: str) -> Optional[Dict[str, Any]]:
+    def _analyze_readme(self, contents: Optional[List[Dict[str, Any]]], files: Dict[str, str]) -> Optional[Dict[str, Any]]:
         """Analyze README and documentation files"""
         try:
-            readme_files = ['README.md', 'README.rst', 'README.txt', 'readme.md']
+            root_files = {item['name']: item for item in contents or [] if item['type'] == 'file'}
             
-            for readme_file in readme_files:
-                url = f"https://api.github.com/repos/{repo_name}/contents/{readme_file}"
-                response = requests.get(url, headers=self.headers)
+            for readme_file in README_FILES:
+                readme_content = files.get(readme_file)
+                if readme_content is None or readme_file not in root_files:
+                    continue
                 
-                if response.status_code == 200:
-                    content = response.json()
-                    
-                    # Get README content
-                    content_url = content['download_url']
-                    content_response = requests.get(content_url)
-                    
-                    if content_response.status_code == 200:
-                        readme_content = content_response.text
-                        
-                        return {
-                            'file': readme_file,
-                            'size': content['size'],
-                            'content_preview': readme_content[:1000],  # First 1000 chars
-                            'sections': self._extract_readme_sections(readme_content),
-                            'has_installation': 'install' in readme_content.lower(),
-                            'has_usage': 'usage' in readme_content.lower() or 'example' in readme_content.lower(),
-                            'has_contributing': 'contributing' in readme_content.lower(),
-                            'has_license': 'license' in readme_content.lower()
-                        }
+                # GraphQL returns whole blobs, so cap here as well
+                size = root_files[readme_file]['size']
+                readme_content = readme_content[:README_MAX_BYTES]
+                
+                return {
+                    'file': readme_file,
+                    'size': size,
+                    'truncated': size > README_MAX_BYTES,
+                    'content_preview': readme_content[:1000],  # First 1000 chars
+                    'sections': self._extract_readme_sections(readme_content),
+                    'has_installation': 'install' in readme_content.lower(),
+                    'has_usage': 'usage' in readme_content.lower() or 'example' in readme_content.lower(),
+                    'has_contributing': 'contributing' in readme_content.lower(),
+                    'has_license': 'license' in readme_content.lower()
+                }
             
             return None
             
@@ -271,7 +401,7 @@ class RepoAnalyzer:
         
         return sections[:10]  # Limit to first 10 sections
     
-    def _find_config_files(self, repo_name: str) -> Dict[str, Any]:
+    def _find_config_files(self, contents: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Find configuration files in the repository"""
         try:
             config_files = {
@@ -283,35 +413,16 @@ class RepoAnalyzer:
                 'other': []
             }
             
-            # Common configuration files
-            config_patterns = {
-                'package_managers': ['package.json', 'requirements.txt', 'Pipfile', 'pyproject.toml', 'Cargo.toml', 'go.mod'],
-                'build_tools': ['Makefile', 'CMakeLists.txt', 'build.gradle', 'pom.xml', 'webpack.config.js'],
-                'linters': ['.eslintrc', '.pylintrc', '.flake8', 'tsconfig.json'],
-                'testing': ['jest.config.js', 'pytest.ini', '.coveragerc', 'tox.ini'],
-                'deployment': ['Dockerfile', 'docker-compose.yml', '.github/workflows', 'deploy.yml'],
-                'other': ['.gitignore', '.env.example', 'LICENSE', 'CHANGELOG.md']
-            }
-            
             # Check for config files in root
-            url = f"https://api.github.com/repos/{repo_name}/contents"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                contents = response.json()
-                
-                for item in contents:
-                    if item['type'] == 'file':
-                        file_name = item['name']
-                        
-                        for category, patterns in config_patterns.items():
-                            if any(pattern in file_name for pattern in patterns):
-                                config_files[category].append({
-                                    'name': file_name,
-                                    'path': item['path'],
-                                    'size': item['size']
-                                })
-                                break
+            for item in contents or []:
+                if item['type'] == 'file':
+                    match = _CONFIG_RE.match(item['name'])
+                    if match:
+                        config_files[match.lastgroup].append({
+                            'name': item['name'],
+                            'path': item['path'],
+                            'size': item['size']
+                        })
             
             return config_files
             
@@ -319,7 +430,7 @@ class RepoAnalyzer:
             print(f"Error finding config files: {e}")
             return {}
     
-    def _analyze_patterns(self, repo_name: str) -> Dict[str, Any]:
+    def _analyze_patterns(self, contents: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Analyze code patterns and conventions"""
         try:
             patterns = {
@@ -330,12 +441,7 @@ class RepoAnalyzer:
             }
             
             # Analyze file extensions
-            url = f"https://api.github.com/repos/{repo_name}/contents"
-            response = requests.get(url, headers=self.headers)
-            
-            if response.status_code == 200:
-                contents = response.json()
-                
+            if contents is not None:
                 extensions = {}
                 for item in contents:
                     if item['type'] == 'file':
@@ -351,7 +457,7 @@ class RepoAnalyzer:
             print(f"Error analyzing patterns: {e}")
             return {}
     
-    def _find_dependencies(self, repo_name: str) -> Dict[str, Any]:
+    def _find_dependencies(self, files: Dict[str, str]) -> Dict[str, Any]:
         """Find project dependencies"""
         try:
             dependencies = {
@@ -362,33 +468,21 @@ class RepoAnalyzer:
             
             # Check for package.json
             try:
-                url = f"https://api.github.com/repos/{repo_name}/contents/package.json"
-                response = requests.get(url, headers=self.headers)
-                if response.status_code == 200:
-                    content = response.json()
-                    content_url = content['download_url']
-                    content_response = requests.get(content_url)
-                    if content_response.status_code == 200:
-                        package_json = json.loads(content_response.text)
-                        dependencies['package.json'] = {
-                            'dependencies': package_json.get('dependencies', {}),
-                            'devDependencies': package_json.get('devDependencies', {}),
-                            'scripts': package_json.get('scripts', {})
-                        }
+                if 'package.json' in files:
+                    package_json = json.loads(files['package.json'])
+                    dependencies['package.json'] = {
+                        'dependencies': package_json.get('dependencies', {}),
+                        'devDependencies': package_json.get('devDependencies', {}),
+                        'scripts': package_json.get('scripts', {})
+                    }
             except Exception as e:
                 print(f"Error parsing package.json: {e}")
             
             # Check for requirements.txt
             try:
-                url = f"https://api.github.com/repos/{repo_name}/contents/requirements.txt"
-                response = requests.get(url, headers=self.headers)
-                if response.status_code == 200:
-                    content = response.json()
-                    content_url = content['download_url']
-                    content_response = requests.get(content_url)
-                    if content_response.status_code == 200:
-                        requirements = content_response.text.split('\n')
-                        dependencies['requirements.txt'] = [req.strip() for req in requirements if req.strip()]
+                if 'requirements.txt' in files:
+                    requirements = files['requirements.txt'].split('\n')
+                    dependencies['requirements.txt'] = [req.strip() for req in requirements if req.strip()]
             except Exception as e:
                 print(f"Error parsing requirements.txt: {e}")
             
@@ -509,6 +603,48 @@ class RepoAnalyzer:
             recommendations.append("Consider adding code linting configuration")
         
         return recommendations
+    
+    def compact_context(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Reduce an analysis to the facts worth spending prompt tokens on
+        
+        Keeps the top languages with whole-number percentages, the largest
+        directories, a few topics and the README flags.
+        """
+        summary = analysis.get('summary', {})
+        structure = analysis.get('structure', {})
+        languages = analysis.get('languages', {})
+        readme = analysis.get('readme')
+        
+        top_languages = sorted(
+            languages.get('languages', {}).items(),
+            key=lambda item: item[1].get('percentage', 0),
+            reverse=True
+        )[:CONTEXT_MAX_LANGUAGES]
+        
+        # Directories with the most entries first
+        directories = sorted(
+            structure.get('directories', []),
+            key=lambda d: -sum(len(d.get('sub_structure', {}).get(kind, [])) for kind in ('files', 'directories'))
+        )
+        
+        return {
+            'project_type': summary.get('project_type', 'Unknown'),
+            'tech_stack': summary.get('tech_stack', []),
+            'primary_language': languages.get('primary_language'),
+            'top_languages': [(name, round(info.get('percentage', 0))) for name, info in top_languages],
+            'top_directories': [d['name'] for d in directories[:CONTEXT_MAX_DIRECTORIES]],
+            'directory_count': len(directories),
+            'package_manager_files': [f['name'] for f in analysis.get('config_files', {}).get('package_managers', [])],
+            'readme': {
+                'file': readme['file'],
+                'size': readme['size'],
+                'truncated': readme.get('truncated', False),
+                'has_installation': readme.get('has_installation', False),
+                'has_usage': readme.get('has_usage', False),
+                'has_contributing': readme.get('has_contributing', False)
+            } if readme else None,
+            'topics': analysis.get('topics', [])[:CONTEXT_MAX_TOPICS]
+        }
 
 # Global instance
 repo_analyzer = RepoAnalyzer()
@@ -0,0 +1,35 @@
+"""
+orjson-backed stand-in for the stdlib ``json`` module
+=====================================================
+
+Modules import this as ``json`` so the GitHub API bodies and model
+responses they parse go through orjson. Only the subset of the ``json``
+interface the backend uses is provided: ``loads``, ``dumps`` (with
+``indent``, ``sort_keys`` and ``default``) and ``JSONDecodeError``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+import orjson
+
+# Subclasses json.JSONDecodeError, so existing except clauses keep working
+JSONDecodeError = orjson.JSONDecodeError
+
+loads = orjson.loads
+
+
+def dumps(obj: Any, *, indent: Optional[int] = None, sort_keys: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> str:
+    """Serialise ``obj`` to a ``str`` like ``json.dumps``.
+
+    orjson only indents by two spaces, so any truthy ``indent`` maps to
+    ``OPT_INDENT_2``.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=default, option=option).decode()
@@ -16,45 +16,103 @@ Usage:
 The backend will listen on port 8000 and the frontend on port 3000.
 """
 
+import asyncio
+import contextvars
+import errno
+import hashlib
 import os
+import select
+import shlex
+import shutil
+import socket
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+# Oldest Python version the setup supports
+MIN_PYTHON = (3, 9)
 
-def run_command(cmd: str, cwd: Union[Path, str, None] = None, check: bool = True) -> subprocess.CompletedProcess:
-    """Run a shell command and handle errors gracefully."""
-    print(f"\n💻 Running: {cmd}")
-    result = subprocess.run(cmd, shell=True, cwd=cwd, capture_output=True, text=True)
-    
-    if result.stdout:
-        print(f"📤 Output: {result.stdout}")
-    if result.stderr:
-        print(f"⚠️  Errors: {result.stderr}")
+# Persistent download caches shared by every run of this script
+CACHE_DIR = Path(os.getenv("AUTOPILOT_CACHE_DIR", Path.home() / ".cache" / "autopilot"))
+
+# Tag prefixed to run_command output so parallel install jobs stay readable
+_job_tag: contextvars.ContextVar[str] = contextvars.ContextVar("job_tag", default="")
+
+
+def run_tagged(tag: str, func: Callable[..., Any], *args: Any) -> Any:
+    """Call ``func`` with run_command output tagged as ``[tag]``."""
+    _job_tag.set(f"[{tag}] ")
+    return func(*args)
+
+
+def run_command(cmd: Union[List[str], str], cwd: Union[Path, str, None] = None, check: bool = True, env: Optional[Dict[str, str]] = None, quiet: bool = False) -> subprocess.CompletedProcess:
+    """Run a command without a shell and handle errors gracefully.
+
+    ``cmd`` is an argument list; a string is split with ``shlex.split``.
+    Output (stdout and stderr merged) is echoed line by line as it is
+    produced rather than captured, so the returned result carries only
+    the exit code. A missing executable is reported like a shell would,
+    with exit code 127, so callers can fall back to alternatives. With
+    ``quiet`` stdout is discarded and only stderr is echoed.
+    """
+    if isinstance(cmd, str):
+        cmd = shlex.split(cmd)
+    cmd = [str(arg) for arg in cmd]
+    tag = _job_tag.get()
+    print(f"\n{tag}💻 Running: {shlex.join(cmd)}")
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.DEVNULL if quiet else subprocess.PIPE,
+            stderr=subprocess.PIPE if quiet else subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+    except FileNotFoundError as e:
+        print(f"{tag}⚠️  Errors: {e}")
+        result = subprocess.CompletedProcess(cmd, 127)
+    else:
+        with proc:
+            if quiet:
+                for line in proc.stderr:
+                    sys.stdout.write(f"{tag}⚠️  {line}")
+            else:
+                for line in proc.stdout:
+                    sys.stdout.write(f"{tag}📤 {line}")
+        result = subprocess.CompletedProcess(cmd, proc.returncode)
     
     if check and result.returncode != 0:
-        raise RuntimeError(f"Command failed with exit code {result.returncode}: {cmd}")
+        raise RuntimeError(f"Command failed with exit code {result.returncode}: {shlex.join(cmd)}")
     
     return result
 
 
 def check_python_version() -> None:
     """Check if Python version is compatible."""
-    version = sys.version_info
-    if version.major < 3 or (version.major == 3 and version.minor < 9):
-        raise RuntimeError(f"Python 3.9+ required, found {version.major}.{version.minor}")
+    if sys.version_info < MIN_PYTHON:
+        version = sys.version_info
+        raise RuntimeError(f"Python {MIN_PYTHON[0]}.{MIN_PYTHON[1]}+ required, found {version.major}.{version.minor}")
 
 
 def ensure_virtualenv(venv_dir: Path) -> tuple[Path, Path]:
     """Create a Python virtual environment if it doesn't exist."""
     if not venv_dir.exists():
         print(f"🔧 Creating virtual environment at {venv_dir}")
+        uv = shutil.which("uv")
+        if uv:
+            # --seed installs pip so the pip fallback keeps working
+            run_command([uv, "venv", "--seed", "--python", "3.12", venv_dir], check=False)
+    if not venv_dir.exists():
         try:
-            run_command(f"python3.12 -m venv {venv_dir}")
+            run_command(["python3.12", "-m", "venv", venv_dir])
         except RuntimeError:
             # Fallback to python3 if python3.12 is not available
-            run_command(f"python3 -m venv {venv_dir}")
+            run_command(["python3", "-m", "venv", venv_dir])
     
     python_exec = venv_dir / "bin" / "python"
     pip_exec = venv_dir / "bin" / "pip"
@@ -65,13 +123,15 @@ def ensure_virtualenv(venv_dir: Path) -> tuple[Path, Path]:
     return python_exec, pip_exec
 
 
-def install_python_deps(pip_exec: Path) -> None:
-    """Install backend Python dependencies including AI packages."""
-    print("📦 Installing Python dependencies...")
-    
-    # Upgrade pip
-    run_command(f"{pip_exec} install --upgrade pip", check=False)
-    
+def install_python_deps(python_exec: Path, pip_exec: Path) -> None:
+    """Install backend Python dependencies including AI packages.
+
+    Uses uv when available (bootstrapping it into the venv with pip if
+    needed) since its resolver and parallel downloads are far faster
+    than pip's, and falls back to plain pip otherwise. A hash of the
+    dependency list is stored in the venv after a successful install so
+    later runs with the same list skip the installer entirely.
+    """
     # Install core dependencies
     core_deps = [
         "fastapi",
@@ -90,7 +150,24 @@ def install_python_deps(pip_exec: Path) -> None:
     
     # Install all dependencies
     all_deps = core_deps + ai_deps
-    run_command(f"{pip_exec} install {' '.join(all_deps)}")
+    marker = python_exec.parent.parent / ".deps.sha"
+    deps_hash = hashlib.sha256("\n".join(all_deps).encode()).hexdigest()
+    if marker.exists() and marker.read_text().strip() == deps_hash:
+        print("📦 Python dependencies already installed; skipping")
+        return
+    
+    print("📦 Installing Python dependencies...")
+    pip_cache = ["--cache-dir", CACHE_DIR / "pip"]
+    uv_exec = Path(shutil.which("uv") or pip_exec.parent / "uv")
+    if not uv_exec.exists():
+        run_command([pip_exec, "install", *pip_cache, "uv"], check=False, quiet=True)
+    if uv_exec.exists():
+        run_command([uv_exec, "pip", "install", "--quiet", "--cache-dir", CACHE_DIR / "uv", "--python", python_exec, *all_deps])
+    else:
+        # uv could not be installed; use pip directly
+        run_command([pip_exec, "install", *pip_cache, "--upgrade", "pip"], check=False, quiet=True)
+        run_command([pip_exec, "install", "--quiet", *pip_cache, *all_deps])
+    marker.write_text(deps_hash)
 
 
 def install_node_deps(frontend_dir: Path) -> None:
@@ -105,7 +182,10 @@ def install_node_deps(frontend_dir: Path) -> None:
         return
     
     print("📦 Installing Node.js dependencies...")
-    run_command("npm install", cwd=frontend_dir)
+    env = os.environ.copy()
+    env["npm_config_cache"] = str(CACHE_DIR / "npm")
+    # Keep warnings and errors but drop progress, funding and audit chatter
+    run_command(["npm", "install", "--no-fund", "--no-audit", "--loglevel=warn"], cwd=frontend_dir, env=env)
 
 
 def setup_environment() -> None:
@@ -144,21 +224,101 @@ def check_services() -> None:
     """Check if required services are available."""
     print("🔍 Checking service availability...")
     
-    # Check if ports are available
+    # Check if ports are available. Both ports are probed with
+    # non-blocking connects and the outcomes collected with one poll().
+    ports = [8000, 3000]
+    in_use = set()
+    pending: Dict[int, Tuple[int, socket.socket]] = {}
+    sockets = []
+    poller = select.poll()
     try:
-        import socket
-        for port in [8000, 3000]:
+        for port in ports:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            result = sock.connect_ex(('localhost', port))
-            sock.close()
+            sockets.append(sock)
+            sock.setblocking(False)
+            result = sock.connect_ex(('127.0.0.1', port))
             if result == 0:
-                print(f"⚠️  Port {port} is already in use")
-    except ImportError:
-        pass
+                in_use.add(port)
+            elif result == errno.EINPROGRESS:
+                pending[sock.fileno()] = (port, sock)
+                poller.register(sock, select.POLLOUT)
+        while pending:
+            events = poller.poll(100)
+            if not events:
+                break
+            for fd, _ in events:
+                poller.unregister(fd)
+                port, sock = pending.pop(fd)
+                if sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    in_use.add(port)
+    finally:
+        for sock in sockets:
+            sock.close()
+    
+    for port in ports:
+        if port in in_use:
+            print(f"⚠️  Port {port} is already in use")
 
 
-def start_services(python_exec: Path, repo_root: Path, frontend_dir: Path) -> None:
-    """Start the backend and frontend services."""
+async def wait_for_port(port: int, timeout: float = 30.0) -> bool:
+    """Wait until something accepts connections on localhost:port."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("localhost", port)
+        except OSError:
+            await asyncio.sleep(0.2)
+            continue
+        writer.close()
+        await writer.wait_closed()
+        return True
+    return False
+
+
+def watch_exit(proc: asyncio.subprocess.Process) -> "asyncio.Future[Any]":
+    """Return a future that completes when the process exits.
+
+    On Linux the child's pidfd is registered with the event loop, so its
+    exit wakes the loop through the same epoll call as socket I/O. Where
+    pidfds or reader callbacks are unavailable this falls back to a
+    ``proc.wait()`` task. Cancelling the future unregisters the pidfd.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        fd = os.pidfd_open(proc.pid)
+    except (AttributeError, OSError):
+        return asyncio.ensure_future(proc.wait())
+    fut = loop.create_future()
+    try:
+        loop.add_reader(fd, lambda: fut.done() or fut.set_result(None))
+    except NotImplementedError:
+        os.close(fd)
+        return asyncio.ensure_future(proc.wait())
+
+    def close(_: "asyncio.Future[Any]") -> None:
+        loop.remove_reader(fd)
+        os.close(fd)
+
+    fut.add_done_callback(close)
+    return fut
+
+
+async def stop_processes(procs: Dict[str, asyncio.subprocess.Process]) -> None:
+    """Terminate the processes, killing any that do not exit within 5s."""
+    running = [proc for proc in procs.values() if proc.returncode is None]
+    for proc in running:
+        proc.terminate()
+    try:
+        await asyncio.wait_for(asyncio.gather(*(proc.wait() for proc in running)), 5)
+    except asyncio.TimeoutError:
+        print("⚠️  Force killing processes...")
+        for proc in running:
+            if proc.returncode is None:
+                proc.kill()
+
+
+async def start_services(python_exec: Path, repo_root: Path, frontend_dir: Path) -> None:
+    """Start the backend and frontend services and supervise them."""
     print("\n🚀 Starting AI-Powered Bug-to-PR Autopilot...")
     print("   Backend: http://localhost:8000")
     print("   Frontend: http://localhost:3000")
@@ -169,51 +329,37 @@ def start_services(python_exec: Path, repo_root: Path, frontend_dir: Path) -> No
     env['PYTHONPATH'] = str(repo_root)
     
     # Start backend
-    backend_cmd = f"{python_exec} -m uvicorn backend.main:app --host 0.0.0.0 --port 8000"
-    backend_proc = subprocess.Popen(
-        backend_cmd, 
-        shell=True, 
+    backend_proc = await asyncio.create_subprocess_exec(
+        str(python_exec), "-m", "uvicorn", "backend.main:app", "--host", "0.0.0.0", "--port", "8000",
         cwd=repo_root,
         env=env
     )
-    
-    # Wait a moment for backend to start
-    import time
-    time.sleep(3)
-    
-    # Start frontend
-    frontend_cmd = "./node_modules/.bin/next dev"
-    frontend_proc = subprocess.Popen(
-        frontend_cmd, 
-        shell=True, 
-        cwd=frontend_dir
-    )
+    procs = {"Backend": backend_proc}
     
     try:
-        # Wait for either process to finish
-        while True:
-            if backend_proc.poll() is not None:
-                print("❌ Backend process stopped unexpectedly")
-                break
-            if frontend_proc.poll() is not None:
-                print("❌ Frontend process stopped unexpectedly")
-                break
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\n🛑 Stopping services...")
-        backend_proc.terminate()
-        frontend_proc.terminate()
+        # Wait for the backend to accept connections
+        if not await wait_for_port(8000):
+            print("⚠️  Backend is not accepting connections yet; starting frontend anyway")
         
-        # Wait for processes to terminate
-        try:
-            backend_proc.wait(timeout=5)
-            frontend_proc.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            print("⚠️  Force killing processes...")
-            backend_proc.kill()
-            frontend_proc.kill()
+        # Start frontend
+        procs["Frontend"] = await asyncio.create_subprocess_exec(
+            "./node_modules/.bin/next", "dev",
+            cwd=frontend_dir
+        )
         
+        # Wait for either process to finish
+        waiters = {watch_exit(proc): name for name, proc in procs.items()}
+        done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        print(f"❌ {waiters[done.pop()]} process stopped unexpectedly")
+        await stop_processes(procs)
+    except asyncio.CancelledError:
+        # asyncio.run cancels us on Ctrl+C
+        print("\n🛑 Stopping services...")
+        await stop_processes(procs)
         print("✅ Services stopped")
+        raise
 
 
 def main() -> None:
@@ -239,12 +385,21 @@ def main() -> None:
         # Create virtual environment
         python_exec, pip_exec = ensure_virtualenv(venv_dir)
         
-        # Install dependencies
-        install_python_deps(pip_exec)
-        install_node_deps(frontend_dir)
+        # Install dependencies; the Python and Node installs are
+        # independent, so run them side by side
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(run_tagged, "py", install_python_deps, python_exec, pip_exec),
+                executor.submit(run_tagged, "node", install_node_deps, frontend_dir),
+            ]
+            for future in as_completed(futures):
+                future.result()
         
         # Start services
-        start_services(python_exec, repo_root, frontend_dir)
+        try:
+            asyncio.run(start_services(python_exec, repo_root, frontend_dir))
+        except KeyboardInterrupt:
+            pass
         
     except Exception as e:
         print(f"\n❌ Error: {e}")
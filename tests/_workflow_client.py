@@ -0,0 +1,206 @@
+"""
+Shared async run watcher for the workflow test scripts
+=======================================================
+
+``test_full_workflow.py`` and ``test_project_issues.py`` both start a run
+and then wait for it to reach a terminal state. ``watch_run`` does that on
+one event loop: it follows ``/runs/{id}/events`` over a single SSE
+connection, approves gates as they open, and falls back to polling
+``/runs/{id}`` when the event stream is unavailable.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import aiohttp
+
+# orjson parses the per-event payloads several times faster; fall back to
+# the stdlib when it is not installed
+try:
+    from orjson import loads as _loads
+except ImportError:
+    _loads = json.loads
+
+BACKEND_URL = "http://localhost:8000"
+GATES = ("propose-fix", "merge-pr")
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Polling fallback backs off while the run sits in one state and snaps back
+# to MIN_INTERVAL on any transition or gate
+MIN_INTERVAL = 0.5
+MAX_INTERVAL = 10.0
+
+CREDENTIAL_VARS = ("GITHUB_TOKEN", "OPENAI_API_KEY", "PORTIA_API_KEY")
+
+# The server sends a keepalive every 30s, so a silent minute means the
+# event stream is dead
+STREAM_READ_TIMEOUT = 60
+
+
+@dataclass
+class RunResult:
+    """Outcome of watching a run"""
+    status: Optional[str] = None
+    run: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed"
+
+
+def creds_look_real() -> bool:
+    """False while any credential still holds a ``your_..._here`` placeholder"""
+    return not any(
+        value.startswith("your_") or value.endswith("_here")
+        for value in (os.environ.get(name, "") for name in CREDENTIAL_VARS)
+    )
+
+
+def new_session() -> aiohttp.ClientSession:
+    """Client session whose connector keeps backend connections alive"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60)
+    )
+
+
+async def approve_gate(session: aiohttp.ClientSession, run_id: str, gate: str,
+                       base_url: str = BACKEND_URL) -> bool:
+    """Approve a waiting gate"""
+    payload = {
+        "gate": gate,
+        "decision": "approve",
+        "note": "Auto-approved by test script"
+    }
+    async with session.post(f"{base_url}/runs/{run_id}/approve", json=payload) as response:
+        return response.status == 200
+
+
+async def get_run(session: aiohttp.ClientSession, run_id: str,
+                  base_url: str = BACKEND_URL) -> Optional[Dict[str, Any]]:
+    """Fetch the run payload, or None if the backend did not return it"""
+    async with session.get(f"{base_url}/runs/{run_id}") as response:
+        if response.status != 200:
+            return None
+        return await response.json()
+
+
+async def watch_run(session: aiohttp.ClientSession, run_id: str,
+                    base_url: str = BACKEND_URL,
+                    timeout: float = 300.0,
+                    gates: Iterable[str] = GATES,
+                    log: Callable[[str], None] = print) -> RunResult:
+    """Wait for a run to finish, approving ``gates`` as they open"""
+    result = RunResult()
+    try:
+        await asyncio.wait_for(
+            _watch(session, run_id, base_url, frozenset(gates), log, result),
+            timeout
+        )
+        if result.status in TERMINAL_STATUSES and not result.error:
+            result.run = await get_run(session, run_id, base_url) or {}
+    except asyncio.TimeoutError:
+        result.error = f"⏰ Workflow monitoring timed out after {timeout:g} seconds"
+    except aiohttp.ClientError as e:
+        result.error = f"❌ Run monitoring error: {e}"
+    return result
+
+
+async def _watch(session: aiohttp.ClientSession, run_id: str, base_url: str,
+                 gates: frozenset, log: Callable[[str], None], result: RunResult) -> None:
+    streamed = await _stream(session, run_id, base_url, gates, log, result)
+    if not streamed:
+        log("⚠️ Event stream unavailable, falling back to polling")
+        await _poll(session, run_id, base_url, gates, log, result)
+
+
+async def _approve(session: aiohttp.ClientSession, run_id: str, base_url: str,
+                   gate: str, log: Callable[[str], None], result: RunResult) -> bool:
+    log(f"⏳ Found waiting gate: {gate}")
+    if await approve_gate(session, run_id, gate, base_url):
+        log(f"✅ Gate {gate} approved")
+        return True
+    result.error = f"❌ Failed to approve gate: {gate}"
+    return False
+
+
+def _set_status(status: Optional[str], log: Callable[[str], None], result: RunResult) -> None:
+    if status and status != result.status:
+        log(f"🔄 Status changed: {result.status} → {status}")
+        result.status = status
+
+
+async def _stream(session: aiohttp.ClientSession, run_id: str, base_url: str,
+                  gates: frozenset, log: Callable[[str], None], result: RunResult) -> bool:
+    """Follow the SSE stream; False if the endpoint is unavailable"""
+    event_type = None
+    async with session.get(
+        f"{base_url}/runs/{run_id}/events",
+        timeout=aiohttp.ClientTimeout(total=None, sock_read=STREAM_READ_TIMEOUT)
+    ) as response:
+        if response.status != 200:
+            return False
+
+        async for raw in response.content:
+            line = raw.decode().rstrip("\r\n")
+            if line.startswith("event: "):
+                event_type = line[7:]
+                continue
+            if not line.startswith("data: "):
+                continue
+            try:
+                data = _loads(line[6:])
+            except json.JSONDecodeError:
+                continue
+
+            if event_type in ("stateChanged", "finished"):
+                _set_status(data.get("status"), log, result)
+                if result.status in TERMINAL_STATUSES:
+                    return True
+            elif event_type == "stepChanged":
+                log(f"📈 Step {data.get('step')} → {data.get('status')}")
+            elif event_type == "clarificationRequested" and data.get("gate") in gates:
+                # The server queues events per subscriber, so nothing is
+                # lost while the approval round-trip is in flight
+                if not await _approve(session, run_id, base_url, data["gate"], log, result):
+                    return True
+
+    result.error = "❌ Event stream closed before the run finished"
+    return True
+
+
+async def _poll(session: aiohttp.ClientSession, run_id: str, base_url: str,
+                gates: frozenset, log: Callable[[str], None], result: RunResult) -> None:
+    """Poll the run until it reaches a terminal state"""
+    interval = 1.0
+    approved_gates = set()
+    while True:
+        run = await get_run(session, run_id, base_url)
+        previous = result.status
+        if run:
+            _set_status(run.get("status"), log, result)
+            if result.status in TERMINAL_STATUSES:
+                return
+
+        waiting = [
+            step.get("name") for step in (run or {}).get("plan", [])
+            if step.get("status") == "waiting"
+            and step.get("name") in gates
+            and step.get("name") not in approved_gates
+        ]
+        if waiting:
+            approved = await asyncio.gather(*(
+                _approve(session, run_id, base_url, gate, log, result) for gate in waiting
+            ))
+            if not all(approved):
+                return
+            approved_gates.update(waiting)
+
+        if result.status != previous or waiting:
+            interval = MIN_INTERVAL
+        else:
+            interval = min(MAX_INTERVAL, interval * 1.5)
+        await asyncio.sleep(interval)
@@ -0,0 +1,47 @@
+"""
+Unit tests for the repository analysis cache.
+"""
+
+import time
+
+from backend.services.analysis_cache import AnalysisCache
+
+
+def test_hit_returns_independent_copy() -> None:
+    cache = AnalysisCache()
+    cache.put("analyze_repository", {"sha": "a"}, "owner/repo", {"topics": ["n8n"]})
+    first = cache.get("analyze_repository", {"sha": "a"}, "owner/repo")
+    first["topics"].append("mutated")
+    assert cache.get("analyze_repository", {"sha": "a"}, "owner/repo") == {"topics": ["n8n"]}
+
+
+def test_new_commit_misses() -> None:
+    cache = AnalysisCache()
+    cache.put("analyze_repository", {"sha": "a"}, "owner/repo", {})
+    assert cache.get("analyze_repository", {"sha": "b"}, "owner/repo") is None
+
+
+def test_entries_expire() -> None:
+    cache = AnalysisCache(ttl=0.01)
+    cache.put("analyze_repository", {}, "owner/repo", {})
+    time.sleep(0.02)
+    assert cache.get("analyze_repository", {}, "owner/repo") is None
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = AnalysisCache(maxsize=2)
+    cache.put("t", {}, "a/one", 1)
+    cache.put("t", {}, "a/two", 2)
+    cache.get("t", {}, "a/one")
+    cache.put("t", {}, "a/three", 3)
+    assert cache.get("t", {}, "a/two") is None
+    assert cache.get("t", {}, "a/one") == 1
+
+
+def test_invalidate_by_pattern() -> None:
+    cache = AnalysisCache()
+    cache.put("t", {}, "owner/one", 1)
+    cache.put("t", {}, "owner/two", 2)
+    cache.put("t", {}, "other/one", 3)
+    assert cache.invalidate_by_pattern("owner/*") == 2
+    assert cache.get("t", {}, "other/one") == 3
@@ -0,0 +1,35 @@
+"""
+Unit tests for the on-disk GitHub ETag cache.
+"""
+
+from backend.services.etag_cache import ETagCache
+
+URL = "https://api.github.com/repos/owner/repo"
+
+
+def test_round_trip(tmp_path) -> None:
+    cache = ETagCache(str(tmp_path))
+    cache.put(URL, {"ETag": '"abc"'}, '{"full_name": "owner/repo"}')
+    entry = cache.get(URL)
+    assert entry["body"] == '{"full_name": "owner/repo"}'
+    assert cache.conditional_headers(entry) == {"If-None-Match": '"abc"'}
+
+
+def test_miss_sends_no_validators(tmp_path) -> None:
+    cache = ETagCache(str(tmp_path))
+    assert cache.get(URL) is None
+    assert cache.conditional_headers(None) == {}
+
+
+def test_response_without_validators_is_not_stored(tmp_path) -> None:
+    cache = ETagCache(str(tmp_path))
+    cache.put(URL, {}, "body")
+    assert cache.get(URL) is None
+
+
+def test_last_modified_is_used_as_validator(tmp_path) -> None:
+    cache = ETagCache(str(tmp_path))
+    cache.put(URL, {"Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, "body")
+    assert cache.conditional_headers(cache.get(URL)) == {
+        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT"
+    }
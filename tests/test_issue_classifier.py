@@ -0,0 +1,53 @@
+"""
+Unit tests for the keyword issue classifier.
+"""
+
+import pytest
+
+from backend.services.issue_classifier import classify
+
+
+def test_license_issue() -> None:
+    analysis = classify({"title": "Add MIT License", "body": ""})
+    assert analysis["issue_type"] == "license"
+    assert analysis["files_to_create"] == ["LICENSE"]
+
+
+def test_readme_issue() -> None:
+    analysis = classify({
+        "title": "Add Categories Overview Table",
+        "body": "The repository needs a categories overview table in the README."
+    })
+    assert analysis["issue_type"] == "documentation"
+    assert analysis["files_to_create"] == ["README.md"]
+
+
+def test_table_title_without_readme_goes_to_the_model() -> None:
+    assert classify({"title": "Add Categories Overview Table", "body": ""}) is None
+
+
+def test_ambiguous_title_goes_to_the_model() -> None:
+    assert classify({"title": "Add LICENSE and CONTRIBUTING"}) is None
+
+
+@pytest.mark.parametrize("title", [
+    "Create users table migration",
+    "Add section to settings page",
+    "Update table rendering in dashboard",
+    "Fix license check in CI",
+])
+def test_code_issue_goes_to_the_model(title: str) -> None:
+    assert classify({"title": title, "body": "Mentioned in the README and the LICENSE."}) is None
+
+
+def test_unrecognised_issue_goes_to_the_model() -> None:
+    assert classify({"title": "Slack alert workflow posts to the wrong channel"}) is None
+
+
+def test_body_is_not_trusted() -> None:
+    assert classify({"title": "Workflow import fails", "body": "Steps are in the README"}) is None
+
+
+def test_result_is_a_fresh_copy() -> None:
+    classify({"title": "Add a .gitignore"})["files_to_create"].append("mutated")
+    assert classify({"title": "Add a .gitignore"})["files_to_create"] == [".gitignore"]
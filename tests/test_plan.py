@@ -9,6 +9,9 @@ manipulate its internal ``ctx`` dictionary directly.
 """
 
 import types
+
+import pytest
+
 from agent.plan import BugToPRPlan
 
 
@@ -22,22 +25,34 @@ class DummyTools:
     pass
 
 
-def test_risk_score_baseline() -> None:
-    plan = BugToPRPlan(tools=DummyTools(), config={"allowlist": []})
+@pytest.fixture(scope="module")
+def _shared_plan() -> BugToPRPlan:
+    """Build the plan once for the whole module."""
+    return BugToPRPlan(tools=DummyTools(), config={"allowlist": []})
+
+
+@pytest.fixture
+def plan(_shared_plan: BugToPRPlan):
+    """Hand each test the shared plan, restoring ``ctx`` afterwards."""
+    base_ctx = dict(_shared_plan.ctx)
+    yield _shared_plan
+    _shared_plan.ctx.clear()
+    _shared_plan.ctx.update(base_ctx)
+
+
+def test_risk_score_baseline(plan: BugToPRPlan) -> None:
     # No context set → baseline risk should be 1
     assert plan._risk_score() == 1
 
 
-def test_risk_score_failing_trace() -> None:
-    plan = BugToPRPlan(tools=DummyTools(), config={"allowlist": []})
+def test_risk_score_failing_trace(plan: BugToPRPlan) -> None:
     plan.ctx["failing_trace"] = "Error: something broke"
     # With failing trace risk increases to 2
     assert plan._risk_score() == 2
 
 
-def test_risk_score_with_pr() -> None:
-    plan = BugToPRPlan(tools=DummyTools(), config={"allowlist": []})
+def test_risk_score_with_pr(plan: BugToPRPlan) -> None:
     plan.ctx["failing_trace"] = "oops"
     plan.ctx["pr_number"] = 42
     # With failing trace and PR number risk increases further to 3
-    assert plan._risk_score() == 3
\ No newline at end of file
+    assert plan._risk_score() == 3
@@ -8,22 +8,19 @@ import sys
 import requests
 import json
 
-def test_portia_api():
-    """Test the real Portia API directly"""
-    
-    print("🔮 Testing Real Portia API")
-    print("=" * 30)
-    
-    # Portia API configuration
-    api_key = "your_portia_api_key_here"
-    base_url = "https://api.portialabs.ai"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
-    
-    # Simple test query
-    test_query = """
+# Shared session so repeated API calls reuse the TLS connection
+SESSION = requests.Session()
+
+# Portia API configuration
+API_KEY = "your_portia_api_key_here"
+BASE_URL = "https://api.portialabs.ai"
+HEADERS = {
+    "Authorization": f"Bearer {API_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Simple test query
+TEST_QUERY = """
     Analyze this simple issue and provide a brief solution:
     
     Issue: The login button is not working properly
@@ -34,23 +31,29 @@ def test_portia_api():
     2. Suggested solution approach
     3. Files that might need modification
     """
+
+RUN_DATA = {
+    "query": TEST_QUERY,
+    "model": "portia-1",
+    "tools": ["code_analysis", "risk_assessment"]
+}
+
+def test_portia_api():
+    """Test the real Portia API directly"""
     
-    run_data = {
-        "query": test_query,
-        "model": "portia-1",
-        "tools": ["code_analysis", "risk_assessment"]
-    }
+    print("🔮 Testing Real Portia API")
+    print("=" * 30)
     
     try:
-        print(f"🔑 Using Portia API key: {api_key[:10]}...")
-        print(f"🌐 API URL: {base_url}/v1/runs")
+        print(f"🔑 Using Portia API key: {API_KEY[:10]}...")
+        print(f"🌐 API URL: {BASE_URL}/v1/runs")
         print()
         
         print("📤 Sending request to Portia API...")
-        response = requests.post(
-            f"{base_url}/v1/runs",
-            headers=headers,
-            json=run_data,
+        response = SESSION.post(
+            f"{BASE_URL}/v1/runs",
+            headers=HEADERS,
+            json=RUN_DATA,
             timeout=30
         )
         
@@ -85,7 +88,7 @@ def test_portia_integration():
     
     try:
         # Set environment variable
-        os.environ['PORTIA_API_KEY'] = "your_portia_api_key_here"
+        os.environ['PORTIA_API_KEY'] = API_KEY
         
         # Import and test the service
         from backend.services.portia_service import portia_service
@@ -1,169 +1,379 @@
 #!/usr/bin/env python3
 """
-Test script to demonstrate repository analysis feature
+Repository analysis tests
+
+The offline tests replay a recorded repository from ``fixtures/n8n_repo``
+through respx and stub the OpenAI client, so they need neither network nor
+credentials. ``test_repository_analysis_live`` is the original end-to-end
+demonstration against the real APIs; it is marked ``live`` and only runs
+with ``--live``.
 """
 
-import os
-import json
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+import orjson
+import pytest
+import respx
+
+from backend.utils import fastjson as json
+from backend.services.etag_cache import etag_cache
 from backend.services.repo_analyzer import repo_analyzer
 from backend.services.ai_fix_generator import AIFixGenerator
 
-def test_repository_analysis():
-    """Test repository analysis functionality"""
+FIXTURES = Path(__file__).parent / "fixtures" / "n8n_repo"
+REPO_NAME = "ritik-prog/n8n-automation-templates-5000"
+API_URL = f"https://api.github.com/repos/{REPO_NAME}"
+RAW_URL = f"https://raw.githubusercontent.com/{REPO_NAME}/main"
+
+TEST_ISSUE = {
+    'title': 'Add Categories Overview Table',
+    'body': 'The repository needs a categories overview table in the README.',
+    'url': 'https://github.com/ritik-prog/n8n-automation-templates-5000/issues/5',
+    'issue_number': '5'
+}
+
+# Matches no classifier rule, so it goes through the AI analysis
+AI_ISSUE = {
+    'title': 'Slack alert workflow posts to the wrong channel',
+    'body': 'The channel parameter in workflows/slack-alerts.json is ignored.',
+    'url': 'https://github.com/ritik-prog/n8n-automation-templates-5000/issues/6',
+    'issue_number': '6'
+}
+
+AI_ANALYSIS = {
+    'issue_type': 'documentation',
+    'priority': 'medium',
+    'required_actions': ['Add a categories table to the README'],
+    'files_to_create': ['README.md'],
+    'files_to_modify': [],
+    'technical_requirements': ['Markdown table'],
+    'solution_approach': 'List every workflow category with its template count',
+    'estimated_complexity': 'low',
+    'testing_requirements': []
+}
+
+FILE_CONTENT = """# n8n Automation Templates
+
+| Category | Templates |
+|----------|-----------|
+| Marketing | 120 |
+| Notifications | 85 |
+"""
+
+
+def _fixture_json(name: str):
+    return orjson.loads((FIXTURES / name).read_bytes())
+
+
+@pytest.fixture
+def mocked_github(monkeypatch, tmp_path):
+    """The recorded repository served over the REST API
+
+    The HEAD lookup is stubbed out so the analysis cache is bypassed, and
+    the ETag cache writes into ``tmp_path``.
+    """
+    monkeypatch.setattr(repo_analyzer, "github_token", None)
+    monkeypatch.setattr(repo_analyzer, "_get_head_sha", lambda repo_name: None)
+    monkeypatch.setattr(etag_cache, "directory", str(tmp_path))
+
+    with respx.mock(assert_all_called=False) as router:
+        router.get(API_URL).respond(json=_fixture_json("repo.json"))
+        router.get(f"{API_URL}/contents").respond(json=_fixture_json("contents.json"))
+        router.get(f"{API_URL}/languages").respond(json=_fixture_json("languages.json"))
+        router.get(f"{API_URL}/topics").respond(json=_fixture_json("topics.json"))
+        router.get(url__regex=re.escape(f"{API_URL}/contents/") + r"(?P<directory>[^/]+)$").mock(
+            side_effect=lambda request, directory: httpx.Response(
+                200, json=_fixture_json(f"contents_{directory}.json")
+            )
+        )
+        router.get(url__regex=re.escape(f"{RAW_URL}/") + r"(?P<name>[^/]+)$").mock(
+            side_effect=lambda request, name: httpx.Response(200, content=(FIXTURES / name).read_bytes())
+        )
+        yield router
+
+
+class _StubCompletions:
+    """Answers chat completions by prompt, recording every prompt it sees"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]['content']
+        self.prompts.append(prompt)
+        if 'Analyze this GitHub issue' in prompt:
+            content = json.dumps(AI_ANALYSIS)
+        elif 'PR title' in prompt:
+            content = '"Docs: Add categories overview table"'
+        else:
+            content = FILE_CONTENT
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def mocked_openai():
+    """An AIFixGenerator whose OpenAI client is a local stub"""
+    generator = AIFixGenerator()
+    completions = _StubCompletions()
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return generator, completions
+
+
+def test_repository_analysis(mocked_github):
+    analysis = repo_analyzer.analyze_repository(REPO_NAME)
+
+    assert 'error' not in analysis
+    assert analysis['repo_info']['full_name'] == REPO_NAME
+
+    structure = analysis['structure']
+    assert structure['file_count'] == 5
+    assert [d['name'] for d in structure['directories']] == ['workflows', 'scripts']
+    assert [f['name'] for f in structure['directories'][0]['sub_structure']['files']] == [
+        'slack-alerts.json', 'email-digest.json'
+    ]
+
+    languages = analysis['languages']
+    assert languages['primary_language'] == 'JavaScript'
+    assert languages['languages']['JavaScript'] == {'bytes': 7500, 'percentage': 75.0}
+    assert languages['total_bytes'] == 10000
+
+    assert analysis['topics'] == ['n8n', 'automation', 'workflows']
+
+    readme = analysis['readme']
+    assert readme['file'] == 'README.md'
+    assert readme['size'] == (FIXTURES / 'README.md').stat().st_size
+    assert not readme['truncated']
+    assert readme['has_installation'] and readme['has_usage']
+    assert '## Usage' in readme['sections']
+
+    config_files = analysis['config_files']
+    assert [f['name'] for f in config_files['package_managers']] == ['package.json']
+    assert {f['name'] for f in config_files['other']} == {'LICENSE', '.gitignore'}
+
+    assert analysis['dependencies']['package.json']['scripts'] == {'validate': 'node scripts/validate.js'}
+    assert analysis['dependencies']['requirements.txt'] is None
+
+    summary = analysis['summary']
+    assert summary['project_type'] == 'JavaScript/TypeScript Project'
+    assert 'npm/yarn' in summary['tech_stack']
+
+
+def test_compact_context(mocked_github):
+    context = repo_analyzer.compact_context(repo_analyzer.analyze_repository(REPO_NAME))
+
+    assert context['top_languages'] == [('JavaScript', 75), ('Shell', 25)]
+    # workflows/ has more entries than scripts/
+    assert context['top_directories'] == ['workflows', 'scripts']
+    assert context['package_manager_files'] == ['package.json']
+    assert context['readme']['has_installation']
+
+
+def test_ai_fix_with_repository_context(mocked_github, mocked_openai):
+    generator, completions = mocked_openai
+
+    fix = generator.analyze_issue_and_generate_fix(AI_ISSUE, REPO_NAME)
+
+    assert fix['fix_type'] == 'documentation'
+    assert [f['path'] for f in fix['files']] == ['README.md']
+    assert fix['files'][0]['content'] == FILE_CONTENT
+    assert fix['pr_title'] == 'Docs: Add categories overview table'
+    assert fix['ai_analysis'] == AI_ANALYSIS
+    # The analysis prompt carries the repository context
+    assert 'Analyze this GitHub issue' in completions.prompts[0]
+    assert 'Primary Language: JavaScript' in completions.prompts[0]
+
+
+def test_recognised_issue_skips_ai_analysis(mocked_github, mocked_openai):
+    generator, completions = mocked_openai
+
+    fix = generator.analyze_issue_and_generate_fix(TEST_ISSUE, REPO_NAME)
+
+    assert fix['fix_type'] == 'documentation'
+    assert [f['path'] for f in fix['files']] == ['README.md']
+    # File content and PR text still come from the model
+    assert completions.prompts
+    assert not any('Analyze this GitHub issue' in prompt for prompt in completions.prompts)
+
+
+@pytest.mark.parametrize("title", [
+    "Create users table migration",
+    "Fix license check in CI",
+])
+def test_code_issue_goes_through_ai_analysis(mocked_github, mocked_openai, title):
+    generator, completions = mocked_openai
+
+    generator.analyze_issue_and_generate_fix({**AI_ISSUE, 'title': title}, REPO_NAME)
+
+    assert 'Analyze this GitHub issue' in completions.prompts[0]
+
+
+def _run_live_analysis(out: list) -> None:
+    """Analyze the real repository and generate a fix, appending the report to ``out``"""
     
-    print("🔍 TESTING REPOSITORY ANALYSIS FEATURE")
-    print("=" * 50)
+    out.append("🔍 TESTING REPOSITORY ANALYSIS FEATURE")
+    out.append("=" * 50)
     
-    # Set up environment
-    os.environ['GITHUB_TOKEN'] = 'your_github_token_here'
-os.environ['OPENAI_API_KEY'] = 'your_openai_api_key_here'
+    repo_name = REPO_NAME
     
-    # Test repository
-    repo_name = "ritik-prog/n8n-automation-templates-5000"
+    out.append(f"📋 Analyzing repository: {repo_name}")
+    out.append('')
     
-    print(f"📋 Analyzing repository: {repo_name}")
-    print()
+    # The AI client is independent of the analysis, so build it on a
+    # worker thread while the GitHub requests are in flight
+    executor = ThreadPoolExecutor(max_workers=1)
+    ai_future = executor.submit(AIFixGenerator)
+    executor.shutdown(wait=False)
     
     # Analyze repository
     analysis = repo_analyzer.analyze_repository(repo_name)
     
     if 'error' in analysis:
-        print(f"❌ Repository analysis failed: {analysis['error']}")
+        out.append(f"❌ Repository analysis failed: {analysis['error']}")
         return
     
-    print("✅ Repository analysis completed!")
-    print()
+    out.append("✅ Repository analysis completed!")
+    out.append('')
     
     # Display analysis results
-    print("📊 ANALYSIS RESULTS:")
-    print("-" * 30)
+    out.append("📊 ANALYSIS RESULTS:")
+    out.append("-" * 30)
     
     # Project summary
     summary = analysis.get('summary', {})
-    print(f"Project Type: {summary.get('project_type', 'Unknown')}")
-    print(f"Tech Stack: {', '.join(summary.get('tech_stack', []))}")
-    print()
+    out.append(f"Project Type: {summary.get('project_type', 'Unknown')}")
+    out.append(f"Tech Stack: {', '.join(summary.get('tech_stack', []))}")
+    out.append('')
     
     # Structure
     structure = analysis.get('structure', {})
-    print(f"File Count: {structure.get('file_count', 0)}")
-    print(f"Directory Count: {structure.get('directory_count', 0)}")
+    out.append(f"File Count: {structure.get('file_count', 0)}")
+    out.append(f"Directory Count: {structure.get('directory_count', 0)}")
     
     if structure.get('directories'):
-        print("Main Directories:")
+        out.append("Main Directories:")
         for dir_info in structure['directories']:
-            print(f"  - {dir_info['name']}")
-    print()
+            out.append(f"  - {dir_info['name']}")
+    out.append('')
     
     # Languages
     languages = analysis.get('languages', {})
     if languages.get('languages'):
-        print("Languages:")
+        out.append("Languages:")
         for lang, info in languages['languages'].items():
-            print(f"  - {lang}: {info['percentage']}%")
-        print(f"Primary Language: {languages.get('primary_language', 'Unknown')}")
-    print()
+            out.append(f"  - {lang}: {info['percentage']}%")
+        out.append(f"Primary Language: {languages.get('primary_language', 'Unknown')}")
+    out.append('')
     
     # Topics
     topics = analysis.get('topics', [])
     if topics:
-        print(f"Repository Topics: {', '.join(topics)}")
-        print()
+        out.append(f"Repository Topics: {', '.join(topics)}")
+        out.append('')
     
     # README
     readme = analysis.get('readme')
     if readme:
-        print(f"README: {readme['file']} ({readme['size']} bytes)")
+        out.append(f"README: {readme['file']} ({readme['size']} bytes)")
         if readme.get('has_installation'):
-            print("  ✓ Has installation instructions")
+            out.append("  ✓ Has installation instructions")
         if readme.get('has_usage'):
-            print("  ✓ Has usage examples")
+            out.append("  ✓ Has usage examples")
         if readme.get('has_contributing'):
-            print("  ✓ Has contributing guidelines")
+            out.append("  ✓ Has contributing guidelines")
     else:
-        print("README: Not found")
-    print()
+        out.append("README: Not found")
+    out.append('')
     
     # Configuration files
     config_files = analysis.get('config_files', {})
     if config_files.get('package_managers'):
-        print("Package Manager Files:")
+        out.append("Package Manager Files:")
         for file_info in config_files['package_managers']:
-            print(f"  - {file_info['name']}")
-    print()
+            out.append(f"  - {file_info['name']}")
+    out.append('')
     
     # Structure insights
     insights = summary.get('structure_insights', [])
     if insights:
-        print("Structure Insights:")
+        out.append("Structure Insights:")
         for insight in insights:
-            print(f"  - {insight}")
-    print()
+            out.append(f"  - {insight}")
+    out.append('')
     
     # Recommendations
     recommendations = summary.get('recommendations', [])
     if recommendations:
-        print("Recommendations:")
+        out.append("Recommendations:")
         for rec in recommendations:
-            print(f"  - {rec}")
-    print()
+            out.append(f"  - {rec}")
+    out.append('')
     
     # Test AI fix generation with repository context
-    print("🤖 TESTING AI FIX GENERATION WITH REPOSITORY CONTEXT")
-    print("-" * 50)
+    out.append("🤖 TESTING AI FIX GENERATION WITH REPOSITORY CONTEXT")
+    out.append("-" * 50)
     
-    ai_generator = AIFixGenerator()
-    if not ai_generator.ai_enabled:
-        print("❌ AI not enabled")
+    ai_generator = ai_future.result()
+    if not ai_generator.client:
+        out.append("❌ AI not enabled")
         return
     
-    # Test issue
-    test_issue = {
-        'title': 'Add Categories Overview Table',
-        'body': 'The repository needs a categories overview table in the README.',
-        'url': 'https://github.com/ritik-prog/n8n-automation-templates-5000/issues/5',
-        'issue_number': '5'
-    }
+    test_issue = TEST_ISSUE
     
-    print(f"📋 Test Issue: {test_issue['title']}")
-    print()
+    out.append(f"📋 Test Issue: {test_issue['title']}")
+    out.append('')
     
     # Generate AI fix with repository context
     fix = ai_generator.analyze_issue_and_generate_fix(test_issue, repo_name)
     
-    print("✅ AI fix generation with repository context completed!")
-    print()
+    out.append("✅ AI fix generation with repository context completed!")
+    out.append('')
     
     # Display fix results
-    print("📝 FIX RESULTS:")
-    print("-" * 20)
+    out.append("📝 FIX RESULTS:")
+    out.append("-" * 20)
     
-    print(f"Fix Type: {fix.get('fix_type', 'unknown')}")
-    print(f"Files to Create: {len(fix.get('files', []))}")
-    print(f"PR Title: {fix.get('pr_title', 'N/A')}")
-    print()
+    out.append(f"Fix Type: {fix.get('fix_type', 'unknown')}")
+    out.append(f"Files to Create: {len(fix.get('files', []))}")
+    out.append(f"PR Title: {fix.get('pr_title', 'N/A')}")
+    out.append('')
     
     # Show generated files
     for file_info in fix.get('files', []):
-        print(f"📄 File: {file_info['path']}")
-        print(f"   Message: {file_info['message']}")
-        print(f"   Content Length: {len(file_info['content'])} characters")
-        print(f"   Content Preview: {file_info['content'][:200]}...")
-        print()
+        out.append(f"📄 File: {file_info['path']}")
+        out.append(f"   Message: {file_info['message']}")
+        out.append(f"   Content Length: {len(file_info['content'])} characters")
+        out.append(f"   Content Preview: {file_info['content'][:200]}...")
+        out.append('')
     
     # Show AI analysis
     if 'ai_analysis' in fix:
         ai_analysis = fix['ai_analysis']
-        print("🤖 AI ANALYSIS:")
-        print("-" * 15)
-        print(f"Issue Type: {ai_analysis.get('issue_type', 'unknown')}")
-        print(f"Priority: {ai_analysis.get('priority', 'unknown')}")
-        print(f"Complexity: {ai_analysis.get('estimated_complexity', 'unknown')}")
-        print(f"Files to Create: {ai_analysis.get('files_to_create', [])}")
-        print(f"Required Actions: {ai_analysis.get('required_actions', [])}")
-        print()
+        out.append("🤖 AI ANALYSIS:")
+        out.append("-" * 15)
+        out.append(f"Issue Type: {ai_analysis.get('issue_type', 'unknown')}")
+        out.append(f"Priority: {ai_analysis.get('priority', 'unknown')}")
+        out.append(f"Complexity: {ai_analysis.get('estimated_complexity', 'unknown')}")
+        out.append(f"Files to Create: {ai_analysis.get('files_to_create', [])}")
+        out.append(f"Required Actions: {ai_analysis.get('required_actions', [])}")
+        out.append('')
     
-    print("🎉 Repository analysis feature test completed!")
+    out.append("🎉 Repository analysis feature test completed!")
+
+@pytest.mark.live
+def test_repository_analysis_live():
+    """Test repository analysis functionality"""
+    out = []
+    try:
+        _run_live_analysis(out)
+    finally:
+        # One write for the whole report rather than a flush per line
+        sys.stdout.write('\n'.join(out) + '\n')
+
 
 if __name__ == "__main__":
-    test_repository_analysis()
+    test_repository_analysis_live()
@@ -0,0 +1,43 @@
+"""
+Unit tests for the repository analysis MessagePack codec.
+"""
+
+from backend.schemas import decode_analysis, encode_analysis
+
+ANALYSIS = {
+    "repo_name": "owner/repo",
+    "structure": {
+        "root_files": [{"name": "README.md", "path": "README.md", "size": 50}],
+        "directories": [],
+        "file_count": 1,
+        "directory_count": 0,
+        "max_depth": 0
+    },
+    "files": {},
+    "languages": {"languages": {"Python": {"bytes": 10, "percentage": 100.0}}, "primary_language": "Python", "total_bytes": 10},
+    "topics": ["n8n"],
+    "readme": None,
+    "config_files": {},
+    "patterns": {},
+    "dependencies": {},
+    "summary": {
+        "project_type": "Python Project",
+        "tech_stack": ["Python"],
+        "structure_insights": [],
+        "recommendations": []
+    }
+}
+
+
+def test_round_trip() -> None:
+    assert decode_analysis(encode_analysis(ANALYSIS)) == ANALYSIS
+
+
+def test_round_trip_keeps_repo_info() -> None:
+    analysis = {**ANALYSIS, "repo_info": {"full_name": "owner/repo"}}
+    assert decode_analysis(encode_analysis(analysis)) == analysis
+
+
+def test_incomplete_analysis_is_not_encoded() -> None:
+    assert encode_analysis({**ANALYSIS, "structure": {"error": "boom"}}) is None
+    assert encode_analysis({**ANALYSIS, "summary": {}}) is None